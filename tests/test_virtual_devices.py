@@ -0,0 +1,255 @@
+# pylint: disable=protected-access
+import asyncio
+from unittest.mock import Mock, call, patch
+
+import pytest
+
+from wb.nm_helper.virtual_devices import (
+    CONNECTION_STATE_NAMES,
+    ActiveConnection,
+    MODEM_ACCESS_TECHNOLOGY_NAMES,
+    ConnectionsMediator,
+    ConnectionState,
+    Event,
+    EventType,
+    MqttConnectionState,
+    format_ip4address_data,
+)
+
+CONNECTION_PATH = "/org/freedesktop/NetworkManager/Settings/1"
+ACTIVE_CONNECTION_PATH = "/org/freedesktop/NetworkManager/ActiveConnection/1"
+DBUS_SETTINGS = {
+    "connection": {"id": "wb-eth0", "uuid": "91f1c71d-2d97-4675-886f-ecbe52b8451e", "type": "802-3-ethernet"}
+}
+DEVICE_TOPIC = "/devices/system__networks__91f1c71d-2d97-4675-886f-ecbe52b8451e"
+
+
+def address(ip4address: str, prefix: int = 24) -> dict:
+    return {"address": ip4address, "prefix": prefix}
+
+
+@pytest.mark.parametrize(
+    "address_data,expected",
+    [
+        ([], ""),
+        ([address("192.168.0.1")], "192.168.0.1"),
+        ([address("192.168.0.1"), address("192.168.0.1", 16)], "192.168.0.1"),
+        (
+            [address("192.168.1.1"), address("192.168.0.1"), address("192.168.1.1")],
+            "192.168.1.1 192.168.0.1",
+        ),
+    ],
+)
+def test_format_ip4address_data(address_data, expected):
+    assert format_ip4address_data(address_data) == expected
+
+
+def test_connection_state_names():
+    assert CONNECTION_STATE_NAMES[ConnectionState.ACTIVATED] == "activated"
+    assert CONNECTION_STATE_NAMES[ConnectionState.DEACTIVATED] == "deactivated"
+
+
+@pytest.mark.parametrize(
+    "access_tech,expected",
+    [
+        (0, "UNKNOWN"),
+        (1 << 14, "LTE"),
+        (1 << 15, "5GNR"),
+        (1 << 9, "HSPA_PLUS"),
+    ],
+)
+def test_modem_access_technology_names(access_tech, expected):
+    assert MODEM_ACCESS_TECHNOLOGY_NAMES[access_tech] == expected
+
+
+# mediator without system bus connection and running loops
+def create_mediator(mqtt_client):
+    mediator = ConnectionsMediator.__new__(ConnectionsMediator)
+    mediator._bus = Mock()
+    mediator._mqtt_client = mqtt_client
+    mediator._nm_settings_interface = Mock()
+    mediator._common_connections = {}
+    mediator._active_connections = {}
+    mediator._active_paths_by_connection_path = {}
+    mediator._pending_properties_events = []
+    mediator._pending_common_updates = {}
+    mediator._common_updates_flush_handle = None
+    mediator._event_loop = Mock()
+    return mediator
+
+
+def test_active_connections_are_read_after_all_settings_replies():
+    mediator = create_mediator(Mock())
+    mediator._nm_settings_interface.ListConnections.return_value = [
+        CONNECTION_PATH,
+        "/org/freedesktop/NetworkManager/Settings/2",
+    ]
+    calls = []
+
+    with patch.object(
+        ConnectionsMediator, "new_event", autospec=True, side_effect=lambda _, event: calls.append(event.type)
+    ), patch.object(
+        ConnectionsMediator,
+        "_create_active_connections",
+        autospec=True,
+        side_effect=lambda _: calls.append("active connections"),
+    ):
+        mediator._create_common_connections()
+        first_call, second_call = mediator._bus.call_async.call_args_list
+        assert not calls
+
+        second_call.kwargs["reply_handler"](DBUS_SETTINGS)
+        assert calls == [EventType.COMMON_CREATE]
+
+        first_call.kwargs["error_handler"](Exception())
+        assert calls == [EventType.COMMON_CREATE, "active connections"]
+
+
+def test_active_connections_read_is_retried_after_error():
+    mediator = create_mediator(Mock())
+    mediator._nm_properties_interface = Mock()
+
+    with patch("wb.nm_helper.virtual_devices.GLib") as glib:
+        mediator._create_active_connections()
+        mediator._nm_properties_interface.Get.call_args.kwargs["error_handler"](Exception())
+        retry = glib.timeout_add_seconds.call_args.args[1]
+        assert mediator._nm_properties_interface.Get.call_count == 1
+
+        retry()
+
+    assert mediator._nm_properties_interface.Get.call_count == 2
+
+
+def test_common_connection_created_after_activation_is_published_active():
+    mqtt_client = Mock()
+    mediator = create_mediator(mqtt_client)
+    mediator._active_connections[ACTIVE_CONNECTION_PATH] = Mock(
+        connection_path=CONNECTION_PATH,
+        state=MqttConnectionState(active=True, connection_state=ConnectionState.ACTIVATED),
+    )
+    mediator._active_paths_by_connection_path[CONNECTION_PATH] = [ACTIVE_CONNECTION_PATH]
+
+    mediator._common_connection_create(CONNECTION_PATH, DBUS_SETTINGS)
+    mqtt_client.publish.reset_mock()
+    mediator._flush_common_connection_updates()
+
+    assert call(f"{DEVICE_TOPIC}/controls/Active", "1", retain=True) in mqtt_client.publish.mock_calls
+    assert call(f"{DEVICE_TOPIC}/controls/State", "activated", retain=True) in mqtt_client.publish.mock_calls
+
+
+def test_updown_button_is_read_only_until_switch_is_finished():
+    mqtt_client = Mock()
+    mediator = create_mediator(mqtt_client)
+    mediator._activate_connection = Mock()
+    mediator._common_connection_create(CONNECTION_PATH, DBUS_SETTINGS)
+    mqtt_client.publish.reset_mock()
+
+    updown_meta_topic = f"{DEVICE_TOPIC}/controls/UpDown/meta"
+    read_only_meta = call(
+        updown_meta_topic,
+        '{"type": "pushbutton", "readonly": true, "title": {"en": "Up"}, "order": 12}',
+        retain=True,
+    )
+    writable_meta = call(
+        updown_meta_topic,
+        '{"type": "pushbutton", "readonly": false, "title": {"en": "Up"}, "order": 12}',
+        retain=True,
+    )
+
+    mediator._common_connection_switch(CONNECTION_PATH)
+    assert mediator._activate_connection.call_args.args[0] == CONNECTION_PATH
+    assert mqtt_client.publish.mock_calls == [read_only_meta]
+
+    mediator._common_connection_switch_finished(CONNECTION_PATH)
+    assert mqtt_client.publish.mock_calls == [read_only_meta, writable_meta]
+
+
+def test_unchanged_connectivity_resyncs_published_state():
+    mqtt_client = Mock()
+    mediator = create_mediator(mqtt_client)
+    mediator._common_connection_create(CONNECTION_PATH, DBUS_SETTINGS)
+    mediator._active_connections[ACTIVE_CONNECTION_PATH] = Mock(
+        connection_path=CONNECTION_PATH,
+        state=MqttConnectionState(active=True, connection_state=ConnectionState.ACTIVATED),
+    )
+    mqtt_client.publish.reset_mock()
+
+    mediator._active_connection_connectivity_updated(ACTIVE_CONNECTION_PATH, False)
+    mediator._flush_common_connection_updates()
+
+    assert call(f"{DEVICE_TOPIC}/controls/Active", "1", retain=True) in mqtt_client.publish.mock_calls
+
+
+def test_dbus_event_is_posted_after_pending_properties_events():
+    mediator = create_mediator(Mock())
+    calls = []
+
+    with patch("wb.nm_helper.virtual_devices.GLib"), patch.object(
+        ConnectionsMediator, "new_event", autospec=True, side_effect=lambda _, event: calls.append(event.type)
+    ):
+        mediator._active_list_update_handler(
+            "org.freedesktop.NetworkManager", {"ActiveConnections": [ACTIVE_CONNECTION_PATH]}
+        )
+        mediator._common_connection_removed_handler(path=CONNECTION_PATH)
+
+    assert calls == [EventType.ACTIVE_LIST_UPDATE, EventType.COMMON_REMOVE]
+
+
+def test_failed_flush_keeps_other_updates(caplog):
+    mediator = create_mediator(Mock())
+    failed_connection = Mock()
+    failed_connection.update.side_effect = RuntimeError("publish failed")
+    other_connection = Mock()
+    mediator._common_connections = {"failed": failed_connection, "other": other_connection}
+    state = MqttConnectionState(active=True)
+    mediator._update_common_connection("failed", state)
+    mediator._update_common_connection("other", state)
+
+    mediator._try_flush_common_connection_updates()
+
+    assert "publish failed" in caplog.text
+    other_connection.update.assert_not_called()
+    assert mediator._event_loop.call_later.call_count == 2
+
+    mediator._try_flush_common_connection_updates()
+
+    other_connection.update.assert_called_once_with(state)
+
+
+def test_failed_pending_update_does_not_drop_next_event():
+    mediator = create_mediator(Mock())
+    failed_connection = Mock()
+    failed_connection.update.side_effect = RuntimeError("publish failed")
+    mediator._common_connections = {"failed": failed_connection, CONNECTION_PATH: Mock()}
+    mediator._event_handlers = {EventType.COMMON_REMOVE: mediator._common_connection_remove}
+    mediator._update_common_connection("failed", MqttConnectionState(active=True))
+    removed_connection = mediator._common_connections[CONNECTION_PATH]
+
+    asyncio.run(mediator._run_async_event(Event(EventType.COMMON_REMOVE, connection_path=CONNECTION_PATH)))
+
+    removed_connection.stop.assert_called_once()
+    assert CONNECTION_PATH not in mediator._common_connections
+
+
+def test_ip4config_and_device_are_read_again_after_failed_read():
+    active_connection = ActiveConnection(Mock(), Mock(), ACTIVE_CONNECTION_PATH, Mock())
+    ip4config_path = "/org/freedesktop/NetworkManager/IP4Config/1"
+    device_path = "/org/freedesktop/NetworkManager/Devices/1"
+
+    with patch.object(
+        ActiveConnection,
+        "_read_ipv4_dbus_properties",
+        side_effect=[{}, {"AddressData": [address("192.168.0.1")]}],
+    ), patch.object(
+        ActiveConnection, "_read_device_dbus_properties", side_effect=[{}, {"Interface": "eth0"}]
+    ):
+        active_connection._set_ip4config(ip4config_path)
+        active_connection._set_devices([device_path])
+        assert active_connection.state.address == ""
+        assert active_connection.state.device == ""
+
+        active_connection._set_ip4config(ip4config_path)
+        active_connection._set_devices([device_path])
+
+    assert active_connection.state.address == "192.168.0.1"
+    assert active_connection.state.device == "eth0"
@@ -0,0 +1,99 @@
+# pylint: disable=protected-access
+import json
+from unittest.mock import Mock, call, patch
+
+from wb.nm_helper import wbmqtt
+
+TEXT_META = wbmqtt.ControlMeta(control_type="text", order=1, read_only=True)
+
+
+def create_device():
+    mqtt_client = Mock()
+    device = wbmqtt.Device(mqtt_client, "test_device", "Test Device", "test-driver")
+    device.create_control("First", TEXT_META, "1")
+    device.create_control("Second", TEXT_META, "2")
+    mqtt_client.publish.reset_mock()
+    return device, mqtt_client
+
+
+def test_set_control_values_publishes_only_changed():
+    device, mqtt_client = create_device()
+
+    device.set_control_values({"First": "1", "Second": "3", "Unknown": "4"})
+
+    assert mqtt_client.publish.mock_calls == [
+        call("/devices/test_device/controls/Second", "3", retain=True),
+    ]
+
+
+def test_set_control_title_publishes_meta():
+    device, mqtt_client = create_device()
+
+    device.set_control_title("First", "Title")
+    device.set_control_title("First", None)
+    device.set_control_title("First", "Title")
+
+    meta_with_title = '{"type": "text", "readonly": true, "title": {"en": "Title"}, "order": 1}'
+    assert mqtt_client.publish.mock_calls == [
+        call("/devices/test_device/controls/First/meta", meta_with_title, retain=True),
+        call(
+            "/devices/test_device/controls/First/meta",
+            '{"type": "text", "readonly": true, "order": 1}',
+            retain=True,
+        ),
+        call("/devices/test_device/controls/First/meta", meta_with_title, retain=True),
+    ]
+
+
+def test_same_control_meta_is_serialized_once_for_devices():
+    first_device, first_client = create_device()
+    second_device, second_client = create_device()
+
+    with patch.dict(wbmqtt._META_JSON_CACHE, clear=True), patch.object(
+        wbmqtt.json, "dumps", wraps=json.dumps
+    ) as dumps:
+        first_device.set_control_read_only("First", False)
+        second_device.set_control_read_only("First", False)
+
+    dumps.assert_called_once()
+
+    assert first_client.publish.mock_calls == [
+        call(
+            "/devices/test_device/controls/First/meta",
+            '{"type": "text", "readonly": false, "order": 1}',
+            retain=True,
+        ),
+    ]
+    assert second_client.publish.mock_calls == first_client.publish.mock_calls
+
+
+def test_remove_device_clears_all_topics():
+    device, mqtt_client = create_device()
+
+    device.remove_device()
+    device.set_control_value("First", "5")
+
+    assert mqtt_client.publish.mock_calls == [
+        call("/devices/test_device/meta/driver", None, retain=True),
+        call("/devices/test_device/meta/name", None, retain=True),
+        call("/devices/test_device/controls/First", None, retain=True),
+        call("/devices/test_device/controls/First/meta", None, retain=True),
+        call("/devices/test_device/controls/Second", None, retain=True),
+        call("/devices/test_device/controls/Second/meta", None, retain=True),
+    ]
+
+
+def test_republish_device():
+    device, mqtt_client = create_device()
+
+    device.republish_device()
+
+    text_meta = '{"type": "text", "readonly": true, "order": 1}'
+    assert mqtt_client.publish.mock_calls == [
+        call("/devices/test_device/meta/name", "Test Device", retain=True),
+        call("/devices/test_device/meta/driver", "test-driver", retain=True),
+        call("/devices/test_device/controls/First/meta", text_meta, retain=True),
+        call("/devices/test_device/controls/First", "1", retain=True),
+        call("/devices/test_device/controls/Second/meta", text_meta, retain=True),
+        call("/devices/test_device/controls/Second", "2", retain=True),
+    ]
@@ -1,16 +1,14 @@
 import argparse
 import asyncio
-import copy
 import enum
 import logging
 import os
 import signal
-import struct
 import sys
 import threading
 import traceback
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 import dbus
 import dbus.lowlevel
@@ -21,13 +19,48 @@ from wb_common.mqtt_client import DEFAULT_BROKER_URL, MQTTClient
 
 from wb.nm_helper import wbmqtt
 from wb.nm_helper.connection_checker import ConnectionChecker
-from wb.nm_helper.connection_manager import DBUS_SERVICE_NAME, check_connectivity
+from wb.nm_helper.connection_manager import (
+    DBUS_SERVICE_NAME,
+    ConfigFile,
+    check_connectivity,
+    read_config_json,
+)
 from wb.nm_helper.network_manager import NMActiveConnection
 
 CONNECTIVITY_CHECK_PERIOD = 20
+ACTIVE_CONNECTIONS_READ_RETRY_DELAY = 1
+# common connections updates collected during this time are published together,
+# it covers NetworkManager signals burst of one connection state change
+COMMON_UPDATES_FLUSH_DELAY = 0.08
 MQTT_DRIVER_NAME = "wb-nm-helper"
 MQTT_DEVICE_TOPIC_PREFIX = "system__networks__"
 PERMANENT_CONNECTED_TYPES = ["loopback", "bridge", "tun"]
+EMPTY_DBUS_PATH = dbus.ObjectPath("/")
+
+
+# NetworkManager passes IPv4 AddressData as list of dicts with address string
+def format_ip4address_data(address_data) -> str:
+    # duplicates are dropped, addresses are kept in NetworkManager order
+    return " ".join(dict.fromkeys(address["address"] for address in address_data))
+
+
+# exception message and traceback for error logs
+def format_error_details(ex: BaseException) -> str:
+    return "\n".join(
+        [
+            "".join(traceback.format_exception_only(None, ex)).strip(),
+            "".join(traceback.format_exception(None, ex, ex.__traceback__)).strip(),
+        ]
+    )
+
+
+# proxies are created without introspection and name owner lookup: each costs a blocking round-trip
+# per object; all methods called through them take no arguments or only strings,
+# and calls are sent to well-known name
+def get_dbus_interface(bus, bus_name: str, path: str, interface_name: str) -> dbus.Interface:
+    return dbus.Interface(
+        bus.get_object(bus_name, path, introspect=False, follow_name_owner_changes=True), interface_name
+    )
 
 
 class EventLoop:
@@ -61,7 +94,9 @@ class EventLoop:
 class EventType(enum.Enum):
     COMMON_CREATE = enum.auto()
     COMMON_SWITCH = enum.auto()
+    COMMON_SWITCH_FINISHED = enum.auto()
     COMMON_REMOVE = enum.auto()
+    COMMON_ACTIVATION_FAILED = enum.auto()
 
     ACTIVE_PROPERTIES_UPDATED = enum.auto()
     ACTIVE_CONNECTIVITY_UPDATED = enum.auto()
@@ -96,17 +131,29 @@ class Event:
         return self._kwargs
 
 
-class Mediator(ABC):  # pylint: disable=R0903
+class Mediator(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def new_event(self, event: Event):
         pass
 
+    @abstractmethod
+    def new_properties_event(self, source, properties: dict, create_event) -> None:
+        pass
+
+    @abstractmethod
+    def new_dbus_event(self, event: Event) -> None:
+        pass
+
 
 @dataclass
 class SubscriptionTarget:
     signal_name: str = None
     dbus_iface: str = None
     bus_name: str = None
+    # first signal argument filter, for PropertiesChanged it is the interface name
+    arg0: str = None
 
 
 class DbusSignalSubscription:
@@ -130,12 +177,14 @@ class DbusSignalSubscription:
             self.unsubscribe()
             self._additional_params = kwargs
             self._path = dbus_path
+            arg0 = self._subscription_target.arg0
             self._handler_match = self._bus.add_signal_receiver(
                 self._signal_handler,
                 self._subscription_target.signal_name,
                 self._subscription_target.dbus_iface,
                 self._subscription_target.bus_name,
                 self._path,
+                **({} if arg0 is None else {"arg0": arg0}),
             )
 
     def unsubscribe(self):
@@ -144,8 +193,10 @@ class DbusSignalSubscription:
             self._handler_match = None
 
     def _signal_handler(self, *args, **_):
-        self._additional_params["new_properties"] = args[1]
-        self._mediator.new_event(Event(self._event_type, **self._additional_params))
+        params = self._additional_params
+        self._mediator.new_properties_event(
+            self, args[1], lambda properties: Event(self._event_type, properties=properties, **params)
+        )
 
 
 class ConnectionState(enum.Enum):
@@ -156,6 +207,9 @@ class ConnectionState(enum.Enum):
     DEACTIVATED = 4
 
 
+CONNECTION_STATE_NAMES = {state: state.name.lower() for state in ConnectionState}
+
+
 @dataclass
 class MqttConnectionState:  # pylint: disable=R0902
     active: bool = False
@@ -169,16 +223,91 @@ class MqttConnectionState:  # pylint: disable=R0902
 
 
 class ConnectionsMediator(Mediator):  # pylint: disable=R0902
+    # events which only update common connections state, updates from them are coalesced
+    COALESCED_EVENT_TYPES = frozenset(
+        (
+            EventType.ACTIVE_LIST_UPDATE,
+            EventType.ACTIVE_CONNECTIVITY_UPDATED,
+            EventType.ACTIVE_PROPERTIES_UPDATED,
+        )
+    )
+
+    __slots__ = (
+        "_bus",
+        "_dbus_loop",
+        "_mqtt_client",
+        "_activate_connection",
+        "_deactivate_connection",
+        "_nm_properties_interface",
+        "_nm_settings_interface",
+        "_common_connections",
+        "_active_connections",
+        "_active_paths_by_connection_path",
+        "_pending_properties_events",
+        "_network_manager_owner",
+        "_event_handlers",
+        "_pending_common_updates",
+        "_common_updates_flush_handle",
+        "_event_loop",
+        "_connectivity_updater",
+        "_deactivation_monitor",
+        "_mosquitto_monitor",
+    )
+
     def __init__(self, mqtt_client) -> None:
         super().__init__()
+        # bus fd is watched by GLib main loop directly, no separate polling is needed;
+        # threads_init is required because D-Bus calls are also made from EventLoop threads
         dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
         dbus.mainloop.glib.threads_init()
+        # the only shared system bus connection, it is passed to every object that talks to
+        # NetworkManager or ModemManager; only DeactivationMonitor opens its own private bus
+        # because a monitor connection can't be used for anything else
         self._bus = dbus.SystemBus()
         self._dbus_loop = GLib.MainLoop()
         self._mqtt_client = mqtt_client
 
+        # proxies are reused for all calls and follow NetworkManager restarts
+        nm_proxy = self._bus.get_object(
+            "org.freedesktop.NetworkManager",
+            "/org/freedesktop/NetworkManager",
+            introspect=False,
+            follow_name_owner_changes=True,
+        )
+        nm_interface = dbus.Interface(nm_proxy, "org.freedesktop.NetworkManager")
+        self._activate_connection = nm_interface.get_dbus_method("ActivateConnection")
+        self._deactivate_connection = nm_interface.get_dbus_method("DeactivateConnection")
+        self._nm_properties_interface = dbus.Interface(nm_proxy, "org.freedesktop.DBus.Properties")
+        nm_settings_proxy = self._bus.get_object(
+            "org.freedesktop.NetworkManager",
+            "/org/freedesktop/NetworkManager/Settings",
+            introspect=False,
+            follow_name_owner_changes=True,
+        )
+        self._nm_settings_interface = dbus.Interface(
+            nm_settings_proxy, "org.freedesktop.NetworkManager.Settings"
+        )
+
         self._common_connections = {}
         self._active_connections = {}
+        self._active_paths_by_connection_path = {}
+        self._pending_properties_events = []
+        self._network_manager_owner = None
+        self._event_handlers = {
+            EventType.COMMON_CREATE: self._common_connection_create,
+            EventType.COMMON_SWITCH: self._common_connection_switch,
+            EventType.COMMON_SWITCH_FINISHED: self._common_connection_switch_finished,
+            EventType.COMMON_REMOVE: self._common_connection_remove,
+            EventType.COMMON_ACTIVATION_FAILED: self._common_connection_activation_failed,
+            EventType.ACTIVE_LIST_UPDATE: self._active_connections_list_update,
+            EventType.ACTIVE_CONNECTIVITY_UPDATED: self._active_connection_connectivity_updated,
+            EventType.ACTIVE_PROPERTIES_UPDATED: self._active_connection_properties_updated,
+            EventType.RELOAD_CONNECTIVITY: self._reload_connectivity,
+            EventType.RELOAD_CONNECTIONS: self._reload_connections,
+            EventType.ACTIVE_DEACTIVATED_BY_CM: self._active_connection_deactivated_by_cm,
+        }
+        self._pending_common_updates = {}
+        self._common_updates_flush_handle = None
         self._event_loop = EventLoop()
         self._connectivity_updater = ConnectivityUpdater(self, self._bus)
 
@@ -191,10 +320,19 @@ class ConnectionsMediator(Mediator):  # pylint: disable=R0902
         self._connectivity_updater.run()
 
         self._create_common_connections()
-        self._create_active_connections()
 
         self._dbus_loop.run()
 
+    # unix signals callbacks, they are called by dbus main loop;
+    # full stop is done by the caller of run() after dbus main loop quits
+    def quit(self) -> bool:
+        self._dbus_loop.quit()
+        return GLib.SOURCE_REMOVE
+
+    def reload_connectivity(self) -> bool:
+        self.new_event(Event(EventType.RELOAD_CONNECTIVITY))
+        return GLib.SOURCE_CONTINUE
+
     def stop(self):
         self._event_loop.stop()
         self._connectivity_updater.stop()
@@ -206,6 +344,7 @@ class ConnectionsMediator(Mediator):  # pylint: disable=R0902
     # Signals handlers
 
     def _set_connections_event_handlers(self):
+        self._bus.watch_name_owner("org.freedesktop.NetworkManager", self._network_manager_owner_handler)
         self._bus.add_signal_receiver(
             self._common_connection_added_handler,
             "NewConnection",
@@ -228,68 +367,116 @@ class ConnectionsMediator(Mediator):  # pylint: disable=R0902
             "org.freedesktop.DBus.Properties",
             "org.freedesktop.NetworkManager",
             "/org/freedesktop/NetworkManager",
+            arg0="org.freedesktop.NetworkManager",
         )
 
+    # active connections are read after all settings replies are handled,
+    # so their state is applied to already created common connections
     def _create_common_connections(self):
-        connections_settings_proxy = self._bus.get_object(
-            "org.freedesktop.NetworkManager", "/org/freedesktop/NetworkManager/Settings"
-        )
+        connections_paths = self._nm_settings_interface.ListConnections()
+        not_read_paths = set(connections_paths)
 
-        connections_settings_interface = dbus.Interface(
-            connections_settings_proxy, "org.freedesktop.NetworkManager.Settings"
-        )
-        connections_paths = connections_settings_interface.ListConnections()
+        def on_settings_handled(connection_path):
+            not_read_paths.discard(connection_path)
+            if not not_read_paths:
+                self._create_active_connections()
 
+        if not not_read_paths:
+            self._create_active_connections()
         for connection_path in connections_paths:
-            self.new_event(Event(EventType.COMMON_CREATE, path=connection_path))
+            self._read_common_connection_settings(connection_path, on_settings_handled)
+
+    # GetSettings calls are not waited for one by one, their replies are handled by dbus main loop
+    def _read_common_connection_settings(self, connection_path, on_settings_handled=None):
+        def on_settings_read(dbus_settings):
+            self.new_dbus_event(
+                Event(EventType.COMMON_CREATE, connection_path=connection_path, dbus_settings=dbus_settings)
+            )
+            if on_settings_handled is not None:
+                on_settings_handled(connection_path)
+
+        def on_settings_read_error(_):
+            logging.error("Common connection %s creation failed", connection_path)
+            if on_settings_handled is not None:
+                on_settings_handled(connection_path)
 
+        # the call is sent to well-known name, it doesn't wait for name owner lookup
+        self._bus.call_async(
+            "org.freedesktop.NetworkManager",
+            connection_path,
+            "org.freedesktop.NetworkManager.Settings.Connection",
+            "GetSettings",
+            "",
+            (),
+            reply_handler=on_settings_read,
+            error_handler=on_settings_read_error,
+        )
+
+    # the list is read from dbus main loop callbacks, so errors are handled here and reading is retried
     def _create_active_connections(self):
-        active_connections_proxy = self._bus.get_object(
-            "org.freedesktop.NetworkManager", "/org/freedesktop/NetworkManager"
+        self._nm_properties_interface.Get(
+            "org.freedesktop.NetworkManager",
+            "ActiveConnections",
+            reply_handler=self._active_connections_read_handler,
+            error_handler=self._active_connections_read_error_handler,
         )
-        active_connections_interface = dbus.Interface(
-            active_connections_proxy, "org.freedesktop.DBus.Properties"
+
+    def _active_connections_read_handler(self, active_connections_paths):
+        self.new_dbus_event(
+            Event(EventType.ACTIVE_LIST_UPDATE, active_connections_paths=active_connections_paths)
         )
-        active_connections_paths = active_connections_interface.Get(
-            "org.freedesktop.NetworkManager", "ActiveConnections"
+
+    def _active_connections_read_error_handler(self, ex):
+        logging.error(
+            "Unable to read active connections, retry in %s s: %s", ACTIVE_CONNECTIONS_READ_RETRY_DELAY, ex
         )
+        GLib.timeout_add_seconds(ACTIVE_CONNECTIONS_READ_RETRY_DELAY, self._retry_create_active_connections)
 
-        self.new_event(Event(EventType.ACTIVE_LIST_UPDATE, path_list=active_connections_paths))
+    def _retry_create_active_connections(self) -> bool:
+        self._create_active_connections()
+        return GLib.SOURCE_REMOVE
 
     # Dbus signals handlers
 
+    def _network_manager_owner_handler(self, owner: str):
+        self._network_manager_owner = owner
+
     def _common_connection_added_handler(self, *args, **kwargs):
         # For some reasons handler receive first signals from non-existed client
         # when you try to do something with connection (add,remove,etc).
         # Finally it receives normal messages after garbage
-        if kwargs["sender"] in self._bus.list_names():
-            self.new_event(Event(EventType.COMMON_CREATE, path=args[0]))
+        if kwargs["sender"] == self._network_manager_owner:
+            self._read_common_connection_settings(args[0])
 
     def _common_connection_removed_handler(self, *_, **kwargs):
-        self.new_event(Event(EventType.COMMON_REMOVE, path=kwargs["path"]))
+        self.new_dbus_event(Event(EventType.COMMON_REMOVE, connection_path=kwargs["path"]))
 
     def _active_list_update_handler(self, *args, **_):
         updated_properties = args[1]
         if "ActiveConnections" in updated_properties:
-            self.new_event(
-                Event(
-                    EventType.ACTIVE_LIST_UPDATE,
-                    path_list=updated_properties["ActiveConnections"],
-                )
+            self.new_properties_event(
+                self,
+                {"ActiveConnections": updated_properties["ActiveConnections"]},
+                lambda properties: Event(
+                    EventType.ACTIVE_LIST_UPDATE, active_connections_paths=properties["ActiveConnections"]
+                ),
             )
 
     # Async event functions
 
-    def _common_connection_create(self, connection_path):
-        if connection_path is None:
+    def _common_connection_create(self, connection_path, dbus_settings):
+        if connection_path is None or dbus_settings is None:
             return
-        try:
-            new_common_connection = CommonConnection(self, self._mqtt_client, self._bus, connection_path)
-            new_common_connection.run()
-            self._common_connections[connection_path] = new_common_connection
-        except dbus.exceptions.DBusException:
-            logging.error("Common connection %s creation failed", connection_path)
+        new_common_connection = CommonConnection(self, self._mqtt_client, connection_path, dbus_settings)
+        new_common_connection.run()
+        self._common_connections[connection_path] = new_common_connection
+        # connection could be activated before its settings were read
+        for active_connection_path in self._active_paths_by_connection_path.get(connection_path, []):
+            self._update_common_connection(
+                connection_path, self._active_connections[active_connection_path].state
+            )
 
+    # button stays read only until NetworkManager replies to activation or deactivation request
     def _common_connection_switch(self, connection_path: str):
         connection = self._common_connections.get(connection_path)
         if connection is None:
@@ -297,33 +484,44 @@ class ConnectionsMediator(Mediator):  # pylint: disable=R0902
 
         connection.set_updown_button_readonly(True)
 
-        active_connections_path = [
-            active_path
-            for active_path, active_connection in self._active_connections.items()
-            if active_connection.connection_path == connection_path
-        ]
+        active_connections_path = self._active_paths_by_connection_path.get(connection_path, [])
 
         if len(active_connections_path) == 0:
             logging.info("Activate connection: %s", connection_path)
-            connection.activate()
+            connection.activate(self._activate_connection)
         elif len(active_connections_path) == 1:
             logging.info("Deactivate connection: %s", active_connections_path[0])
-            self._active_connections[active_connections_path[0]].deactivate()
+            self._active_connections[active_connections_path[0]].deactivate(self._deactivate_connection)
         else:
             logging.error("Unable to find connection to switch")
+            connection.set_updown_button_readonly(False)
 
-        connection.set_updown_button_readonly(False)
+    def _common_connection_switch_finished(self, connection_path: str) -> None:
+        connection = self._common_connections.get(connection_path)
+        if connection is not None:
+            connection.set_updown_button_readonly(False)
+
+    def _common_connection_activation_failed(self, connection_path: str) -> None:
+        connection = self._common_connections.get(connection_path)
+        if connection is not None:
+            connection.set_activation_failed()
+            connection.set_updown_button_readonly(False)
 
     def _common_connection_remove(self, connection_path):
-        if connection_path is not None and connection_path in self._common_connections:
-            self._common_connections[connection_path].stop()
-            self._common_connections.pop(connection_path)
+        connection = self._common_connections.pop(connection_path, None)
+        if connection is not None:
+            connection.stop()
 
     def _active_connections_list_update(self, active_connections_paths):
         if active_connections_paths is None:
             return
 
-        old_active_paths = [x for x in self._active_connections if x not in active_connections_paths]
+        active_connections_paths_set = set(active_connections_paths)
+        # NetworkManager resends unchanged list with other properties changes
+        if active_connections_paths_set == self._active_connections.keys():
+            return
+
+        old_active_paths = [x for x in self._active_connections if x not in active_connections_paths_set]
         new_active_paths = [x for x in active_connections_paths if x not in self._active_connections]
 
         for new_active_path in new_active_paths:
@@ -336,6 +534,9 @@ class ConnectionsMediator(Mediator):  # pylint: disable=R0902
                     new_active_connection.connection_path, new_active_connection.state
                 )
                 self._active_connections[new_active_path] = new_active_connection
+                self._active_paths_by_connection_path.setdefault(
+                    new_active_connection.connection_path, []
+                ).append(new_active_path)
             except dbus.exceptions.DBusException:
                 # When connection up/down/create/remove is in process, active connections list
                 # changes very fast and it's impossible to create some temporary active connections
@@ -346,15 +547,19 @@ class ConnectionsMediator(Mediator):  # pylint: disable=R0902
                 logging.debug("New active connection create failed %s", new_active_path)
 
         for old_active_path in old_active_paths:
-            old_active_connection = self._active_connections[old_active_path]
+            old_active_connection = self._active_connections.pop(old_active_path)
             old_active_connection.stop()
 
             self._update_common_connection(old_active_connection.connection_path, old_active_connection.state)
 
-            self._active_connections.pop(old_active_path)
+            active_paths = self._active_paths_by_connection_path[old_active_connection.connection_path]
+            active_paths.remove(old_active_path)
+            if not active_paths:
+                self._active_paths_by_connection_path.pop(old_active_connection.connection_path)
 
     def _active_connection_connectivity_updated(self, active_connection_path: str, connectivity: bool):
         active_connection = self._active_connections.get(active_connection_path)
+        # periodic checks resync the whole state, CommonConnection publishes only if it differs from published
         if active_connection is not None:
             active_connection.update_connectivity(connectivity)
             self._update_common_connection(active_connection.connection_path, active_connection.state)
@@ -374,10 +579,42 @@ class ConnectionsMediator(Mediator):  # pylint: disable=R0902
         for connection in self._common_connections.values():
             connection.republish()
 
+    # NetworkManager sends bursts of signals during connection state change,
+    # only the last state of every common connection is published after the burst is handled
     def _update_common_connection(self, connection_path: str, state: MqttConnectionState) -> None:
-        connection = self._common_connections.get(connection_path)
-        if connection is not None:
-            connection.update(state)
+        if connection_path not in self._common_connections:
+            return
+        self._pending_common_updates[connection_path] = state
+        self._schedule_common_updates_flush()
+
+    def _schedule_common_updates_flush(self) -> None:
+        if self._common_updates_flush_handle is None and self._pending_common_updates:
+            self._common_updates_flush_handle = self._event_loop.call_later(
+                COMMON_UPDATES_FLUSH_DELAY, self._try_flush_common_connection_updates
+            )
+
+    # failed update of one connection is logged and doesn't stop the event or timer that flushes updates
+    def _try_flush_common_connection_updates(self) -> None:
+        try:
+            self._flush_common_connection_updates()
+        except BaseException as ex:  # pylint: disable=W0718
+            logging.error("Error during common connections updates flush %s", format_error_details(ex))
+
+    def _flush_common_connection_updates(self) -> None:
+        if self._common_updates_flush_handle is not None:
+            self._common_updates_flush_handle.cancel()
+            self._common_updates_flush_handle = None
+        pending_updates = self._pending_common_updates
+        try:
+            while pending_updates:
+                connection_path = next(iter(pending_updates))
+                connection = self._common_connections.get(connection_path)
+                state = pending_updates.pop(connection_path)
+                if connection is not None:
+                    connection.update(state)
+        finally:
+            # updates left after a failed one are published later
+            self._schedule_common_updates_flush()
 
     def _active_connection_deactivated_by_cm(self, active_connection_path: str) -> None:
         active_connection = self._active_connections.get(active_connection_path)
@@ -391,52 +628,41 @@ class ConnectionsMediator(Mediator):  # pylint: disable=R0902
     async def _run_async_event(self, event: Event):
         logging.debug("Execute event %s %s %s", event.number, event.type.name, event.kwargs)
         try:
-            if event.type == EventType.COMMON_CREATE:
-                self._common_connection_create(event.kwargs.get("path"))
-
-            elif event.type == EventType.COMMON_SWITCH:
-                self._common_connection_switch(event.kwargs.get("connection_path"))
-
-            elif event.type == EventType.COMMON_REMOVE:
-                self._common_connection_remove(event.kwargs.get("path"))
-
-            elif event.type == EventType.ACTIVE_LIST_UPDATE:
-                self._active_connections_list_update(event.kwargs.get("path_list"))
-
-            elif event.type == EventType.ACTIVE_CONNECTIVITY_UPDATED:
-                self._active_connection_connectivity_updated(
-                    event.kwargs.get("active_connection_path"), event.kwargs.get("connectivity")
-                )
-
-            elif event.type == EventType.ACTIVE_PROPERTIES_UPDATED:
-                self._active_connection_properties_updated(
-                    event.kwargs.get("active_connection_path"), event.kwargs.get("new_properties")
-                )
-
-            elif event.type == EventType.RELOAD_CONNECTIVITY:
-                self._reload_connectivity()
-
-            elif event.type == EventType.RELOAD_CONNECTIONS:
-                self._reload_connections()
-
-            elif event.type == EventType.ACTIVE_DEACTIVATED_BY_CM:
-                self._active_connection_deactivated_by_cm(event.kwargs.get("active_connection_path"))
-
+            # keep publications order for events which change common connections directly
+            if event.type not in self.COALESCED_EVENT_TYPES:
+                self._try_flush_common_connection_updates()
+            self._event_handlers[event.type](**event.kwargs)
         except BaseException as ex:
-            logging.error(
-                "Error during event execution %s",
-                "\n".join(
-                    [
-                        "".join(traceback.format_exception_only(None, ex)).strip(),
-                        "".join(traceback.format_exception(None, ex, ex.__traceback__)).strip(),
-                    ]
-                ),
-            )
+            logging.error("Error during event execution %s", format_error_details(ex))
             raise
 
     def new_event(self, event: Event):
         self._event_loop.run_coroutine_threadsafe(self._run_async_event(event))
 
+    # PropertiesChanged signals come in bursts, consecutive signals from the same source are merged
+    # and posted as one event when dbus main loop is idle; called only from dbus main loop thread
+    def new_properties_event(self, source, properties: dict, create_event) -> None:
+        pending_events = self._pending_properties_events
+        if pending_events and pending_events[-1][0] is source:
+            pending_events[-1][1].update(properties)
+            return
+        if not pending_events:
+            GLib.idle_add(self._post_pending_properties_events)
+        pending_events.append((source, dict(properties), create_event))
+
+    # other events from dbus main loop are posted after PropertiesChanged events received before them,
+    # so they are not handled ahead of pending properties events
+    def new_dbus_event(self, event: Event) -> None:
+        self._post_pending_properties_events()
+        self.new_event(event)
+
+    def _post_pending_properties_events(self) -> bool:
+        pending_events = self._pending_properties_events
+        self._pending_properties_events = []
+        for _, properties, create_event in pending_events:
+            self.new_event(create_event(properties))
+        return GLib.SOURCE_REMOVE
+
 
 class ConnectivityUpdater:
     def __init__(self, mediator: Mediator, bus: dbus.Bus):
@@ -444,7 +670,6 @@ class ConnectivityUpdater:
         self._bus = bus
         self._event_loop = EventLoop()
         self._futures = {}
-        self._connection_checker = ConnectionChecker()
 
     def run(self):
         self._event_loop.run()
@@ -488,16 +713,44 @@ class ConnectivityUpdater:
             logging.debug("Can't define if connection has permanent connectivity: %s", ex)
             return False
 
+    # blocking check is run in executor thread,
+    # so a slow or timed out check doesn't delay checks of other connections
+    def _read_connectivity(
+        self,
+        nm_active_connection: NMActiveConnection,
+        connection_checker: ConnectionChecker,
+        config: ConfigFile,
+    ) -> bool:
+        try:
+            return check_connectivity(nm_active_connection, connection_checker, config)
+        except BaseException as ex:  # pylint: disable=W0718
+            logging.error("Unable to read connectivity for %s: %s", nm_active_connection.get_path(), ex)
+            return False
+
+    # config is read once per check loop, loops are restarted on reload;
+    # if it can't be read, check_connectivity tries to read it on every check
+    def _read_connectivity_config(self) -> ConfigFile:
+        try:
+            config = ConfigFile()
+            config.load_config(read_config_json())
+            return config
+        except BaseException as ex:  # pylint: disable=W0718
+            logging.error("Unable to read connectivity check config: %s", ex)
+            return None
+
     async def _check_connectivity(self, active_connection_path: str, period):
         logging.debug("Check connectivity for %s", active_connection_path)
 
+        # checker remembers last reachable address, so checks running in parallel don't share it
+        connection_checker = ConnectionChecker()
+        # active connection object keeps its dbus proxies between checks
+        nm_active_connection = NMActiveConnection(active_connection_path, self._bus)
+        event_loop = asyncio.get_running_loop()
+        config = await event_loop.run_in_executor(None, self._read_connectivity_config)
         while True:
-            connectivity = False
-            try:
-                nm_active_connection = NMActiveConnection(active_connection_path, self._bus)
-                connectivity = check_connectivity(nm_active_connection, self._connection_checker)
-            except BaseException as ex:  # pylint: disable=W0718
-                logging.error("Unable to read connectivity for %s: %s", active_connection_path, ex)
+            connectivity = await event_loop.run_in_executor(
+                None, self._read_connectivity, nm_active_connection, connection_checker, config
+            )
 
             self._mediator.new_event(
                 Event(
@@ -517,6 +770,18 @@ class ConnectivityUpdater:
 
 
 class CommonConnection:  # pylint: disable=R0902
+    __slots__ = (
+        "_mediator",
+        "_path",
+        "_mqtt_client",
+        "_name",
+        "_uuid",
+        "_type",
+        "_mqtt_device",
+        "_deactivated_by_cm",
+        "_last_update",
+    )
+
     NAME_CONTROL_META = wbmqtt.ControlMeta(
         control_type="text",
         order=1,
@@ -581,28 +846,42 @@ class CommonConnection:  # pylint: disable=R0902
         read_only=False,
     )
 
+    # state controls are created with default connection state values
+    STATE_CONTROLS = (
+        ("Active", ACTIVE_CONTROL_META, "1" if MqttConnectionState.active else "0"),
+        ("Device", DEVICE_CONTROL_META, MqttConnectionState.device),
+        ("State", STATE_CONTROL_META, CONNECTION_STATE_NAMES[MqttConnectionState.connection_state]),
+        ("Address", ADDRESS_CONTROL_META, MqttConnectionState.address),
+        ("Connectivity", CONNECTIVITY_CONTROL_META, "1" if MqttConnectionState.connectivity else "0"),
+        ("UpDown", UPDOWN_CONTROL_META, None),  # button
+    )
+    GSM_CONTROLS = (
+        ("Operator", OPERATOR_CONTROL_META, MqttConnectionState.operator_name),
+        ("SignalQuality", SIGNAL_QUALITY_CONTROL_META, MqttConnectionState.signal_quality),
+        ("AccessTechnologies", ACCESS_TECH_CONTROL_META, MqttConnectionState.access_tech),
+    )
+
     def __init__(
         self,
         mediator: Mediator,
         mqtt_client: MQTTClient,
-        dbus_bus: dbus.Bus,
         path: str,
+        dbus_settings: dict,
     ):
         self._mediator = mediator
-        self._bus = dbus_bus
         self._path = path
         self._mqtt_client = mqtt_client
-        self._type = None
-        self._name = None
-        self._uuid = None
+        self._name = str(dbus_settings["connection"]["id"])
+        self._uuid = str(dbus_settings["connection"]["uuid"])
+        self._type = str(dbus_settings["connection"]["type"])
         self._mqtt_device = None
         self._deactivated_by_cm = False
+        self._last_update = None
 
         logging.info("New connection %s", self._path)
 
     # publish device and with default state and create subscriptions
     def run(self):
-        self._read_dbus_settings()
         self._create_virtual_device()
         logging.info("New virtual device %s %s %s", self._name, self._uuid, self._path)
 
@@ -614,26 +893,34 @@ class CommonConnection:  # pylint: disable=R0902
 
     # update controls values from state
     def update(self, state: MqttConnectionState) -> None:
+        # most of NetworkManager signals don't change anything published
+        if self._last_update == (state, self._deactivated_by_cm):
+            return
+
         self._mqtt_device.set_control_value("Active", "1" if state.active else "0")
         self._mqtt_device.set_control_title("UpDown", "Down" if state.active else "Up")
-        self._mqtt_device.set_control_value("Device", state.device)
 
         if state.connection_state in (ConnectionState.ACTIVATED, ConnectionState.ACTIVATING):
             self._deactivated_by_cm = False
-        state_name = state.connection_state.name.lower()
+        state_name = CONNECTION_STATE_NAMES[state.connection_state]
         if self._deactivated_by_cm and state.connection_state in (
             ConnectionState.DEACTIVATED,
             ConnectionState.DEACTIVATING,
         ):
             state_name = state_name + " by wb-connection-manager"
-        self._mqtt_device.set_control_value("State", state_name)
 
-        self._mqtt_device.set_control_value("Address", state.address)
-        self._mqtt_device.set_control_value("Connectivity", "1" if state.connectivity else "0")
+        values = {
+            "Device": state.device,
+            "State": state_name,
+            "Address": state.address,
+            "Connectivity": "1" if state.connectivity else "0",
+        }
         if self._type == "gsm":
-            self._mqtt_device.set_control_value("Operator", state.operator_name)
-            self._mqtt_device.set_control_value("SignalQuality", state.signal_quality)
-            self._mqtt_device.set_control_value("AccessTechnologies", state.access_tech)
+            values["Operator"] = state.operator_name
+            values["SignalQuality"] = state.signal_quality
+            values["AccessTechnologies"] = state.access_tech
+        self._mqtt_device.set_control_values(values)
+        self._last_update = (replace(state), self._deactivated_by_cm)
         logging.debug(
             "Update virtual device settings for %s %s %s %s", self._name, self._uuid, self._path, state
         )
@@ -650,30 +937,31 @@ class CommonConnection:  # pylint: disable=R0902
             self._mqtt_device.remove_device()
         logging.info("Remove virtual device %s %s %s", self._name, self._uuid, self._path)
 
-    def activate(self):
-        try:
-            proxy = self._bus.get_object("org.freedesktop.NetworkManager", "/org/freedesktop/NetworkManager")
-            interface = dbus.Interface(proxy, "org.freedesktop.NetworkManager")
-            empty_proxy = self._bus.get_object("org.freedesktop.NetworkManager", "/")
-            # ActivateConnection and DeactivateConnection functions ends very fast
-            # even if connection activating/deactivating process can take a long time
-            interface.ActivateConnection(self._path, empty_proxy, empty_proxy)
-        except dbus.exceptions.DBusException:
-            logging.error(
-                "Unable to activate %s %s connection, no suitable device found",
-                self._name,
-                self._uuid,
-            )
-            # this is for interface
-            self._mqtt_device.set_control_value("State", "deactivated", force=True)
+    # ActivateConnection reply is handled by dbus main loop, the call doesn't block events processing
+    def activate(self, activate_connection):
+        activate_connection(
+            self._path,
+            EMPTY_DBUS_PATH,
+            EMPTY_DBUS_PATH,
+            reply_handler=self._activate_reply_handler,
+            error_handler=self._activate_error_handler,
+        )
 
-    def _read_dbus_settings(self):
-        proxy = self._bus.get_object("org.freedesktop.NetworkManager", self._path)
-        interface = dbus.Interface(proxy, "org.freedesktop.NetworkManager.Settings.Connection")
-        dbus_settings = interface.GetSettings()
-        self._name = str(dbus_settings["connection"]["id"])
-        self._uuid = str(dbus_settings["connection"]["uuid"])
-        self._type = str(dbus_settings["connection"]["type"])
+    def set_activation_failed(self) -> None:
+        # this is for interface
+        self._mqtt_device.set_control_value("State", "deactivated", force=True)
+
+    def _activate_reply_handler(self, active_connection_path):
+        logging.debug("Activation of %s started: %s", self._path, active_connection_path)
+        self._mediator.new_dbus_event(Event(EventType.COMMON_SWITCH_FINISHED, connection_path=self._path))
+
+    def _activate_error_handler(self, _):
+        logging.error(
+            "Unable to activate %s %s connection, no suitable device found",
+            self._name,
+            self._uuid,
+        )
+        self._mediator.new_dbus_event(Event(EventType.COMMON_ACTIVATION_FAILED, connection_path=self._path))
 
     def _updown_message_callback(self, _, __, ___):
         self._mediator.new_event(Event(EventType.COMMON_SWITCH, connection_path=self._path))
@@ -681,35 +969,20 @@ class CommonConnection:  # pylint: disable=R0902
     def _create_virtual_device(self):
         self._mqtt_device = wbmqtt.Device(
             self._mqtt_client,
-            MQTT_DEVICE_TOPIC_PREFIX + self._uuid,
-            "Network Connection " + self._name,
+            f"{MQTT_DEVICE_TOPIC_PREFIX}{self._uuid}",
+            f"Network Connection {self._name}",
             MQTT_DRIVER_NAME,
         )
 
-        active_value = "1" if MqttConnectionState.active else "0"
-        state_value = MqttConnectionState.connection_state.name.lower()
-        connectivity_value = "1" if MqttConnectionState.connectivity else "0"
-
         self._mqtt_device.create_control("Name", self.NAME_CONTROL_META, self._name)
         self._mqtt_device.create_control("UUID", self.UUID_CONTROL_META, self._uuid)
         self._mqtt_device.create_control("Type", self.TYPE_CONTROL_META, self._type)
-        self._mqtt_device.create_control("Active", self.ACTIVE_CONTROL_META, active_value)
-        self._mqtt_device.create_control("Device", self.DEVICE_CONTROL_META, MqttConnectionState.device)
-        self._mqtt_device.create_control("State", self.STATE_CONTROL_META, state_value)
-        self._mqtt_device.create_control("Address", self.ADDRESS_CONTROL_META, MqttConnectionState.address)
-        self._mqtt_device.create_control("Connectivity", self.CONNECTIVITY_CONTROL_META, connectivity_value)
-        self._mqtt_device.create_control("UpDown", self.UPDOWN_CONTROL_META, None)  # button
+        for mqtt_control_name, meta, value in self.STATE_CONTROLS:
+            self._mqtt_device.create_control(mqtt_control_name, meta, value)
         self._mqtt_device.add_control_message_callback("UpDown", self._updown_message_callback)
         if self._type == "gsm":
-            self._mqtt_device.create_control(
-                "Operator", self.OPERATOR_CONTROL_META, MqttConnectionState.operator_name
-            )
-            self._mqtt_device.create_control(
-                "SignalQuality", self.SIGNAL_QUALITY_CONTROL_META, MqttConnectionState.signal_quality
-            )
-            self._mqtt_device.create_control(
-                "AccessTechnologies", self.ACCESS_TECH_CONTROL_META, MqttConnectionState.access_tech
-            )
+            for mqtt_control_name, meta, value in self.GSM_CONTROLS:
+                self._mqtt_device.create_control(mqtt_control_name, meta, value)
 
 
 class DeactivationMonitor:
@@ -732,7 +1005,7 @@ class DeactivationMonitor:
         args = msg.get_args_list()
         if args[0].startswith("/org/freedesktop/NetworkManager/ActiveConnection"):
             logging.debug("Connection deactivation from %s\n%s", msg.get_sender(), args)
-            self._mediator.new_event(
+            self._mediator.new_dbus_event(
                 Event(EventType.ACTIVE_DEACTIVATED_BY_CM, active_connection_path=args[0])
             )
 
@@ -763,7 +1036,32 @@ class ModemAccessTechnology(enum.Enum):
     MM_MODEM_ACCESS_TECHNOLOGY_ANY = 0xFFFFFFFF
 
 
+# published names by ModemManager access-technologies value
+MODEM_ACCESS_TECHNOLOGY_NAMES = {
+    access_tech.value: access_tech.name.replace("MM_MODEM_ACCESS_TECHNOLOGY_", "").upper()
+    for access_tech in ModemAccessTechnology
+}
+
+
 class ActiveConnection:  # pylint: disable=R0902
+    __slots__ = (
+        "_mediator",
+        "_bus",
+        "_path",
+        "_connectivity_updater",
+        "_active_connection_properties_changed_subscription",
+        "_ipv4_config_changed_subscription",
+        "connection_path",
+        "state",
+        "_type",
+        "_name",
+        "_uuid",
+        "_modem_path",
+        "_modem_interface",
+        "_device_path",
+        "_ip4config_path",
+    )
+
     def __init__(
         self,
         mediator: Mediator,
@@ -777,9 +1075,11 @@ class ActiveConnection:  # pylint: disable=R0902
         self._connectivity_updater = connectivity_updater
 
         self._active_connection_properties_changed_subscription = (
-            self._create_subscription_on_dbus_properties()
+            self._create_subscription_on_dbus_properties("org.freedesktop.NetworkManager.Connection.Active")
+        )
+        self._ipv4_config_changed_subscription = self._create_subscription_on_dbus_properties(
+            "org.freedesktop.NetworkManager.IP4Config"
         )
-        self._ipv4_config_changed_subscription = self._create_subscription_on_dbus_properties()
 
         self.connection_path = None
         self.state = MqttConnectionState(active=True)
@@ -787,6 +1087,9 @@ class ActiveConnection:  # pylint: disable=R0902
         self._name = None
         self._uuid = None
         self._modem_path = None
+        self._modem_interface = None
+        self._device_path = None
+        self._ip4config_path = None
 
     def run(self):
         dbus_properties = self._read_connection_dbus_properties(self._path)
@@ -806,8 +1109,9 @@ class ActiveConnection:  # pylint: disable=R0902
 
     def _read_connection_dbus_properties(self, path) -> dict:
         try:
-            proxy = self._bus.get_object("org.freedesktop.NetworkManager", path)
-            interface = dbus.Interface(proxy, "org.freedesktop.DBus.Properties")
+            interface = get_dbus_interface(
+                self._bus, "org.freedesktop.NetworkManager", path, "org.freedesktop.DBus.Properties"
+            )
             return interface.GetAll("org.freedesktop.NetworkManager.Connection.Active")
         except dbus.exceptions.DBusException:
             # Please read message about ActiveConnection creation process in
@@ -821,46 +1125,72 @@ class ActiveConnection:  # pylint: disable=R0902
 
     def _read_modem_dbus_properties(self, modem_path) -> dict:
         try:
-            proxy = self._bus.get_object("org.freedesktop.ModemManager1", modem_path)
-            interface = dbus.Interface(proxy, "org.freedesktop.ModemManager1.Modem.Simple")
-            return interface.GetStatus()
+            # modem status is read on every connection state change, so the interface is reused
+            if self._modem_interface is None or self._modem_interface.object_path != modem_path:
+                self._modem_interface = get_dbus_interface(
+                    self._bus,
+                    "org.freedesktop.ModemManager1",
+                    modem_path,
+                    "org.freedesktop.ModemManager1.Modem.Simple",
+                )
+            return self._modem_interface.GetStatus()
         except dbus.exceptions.DBusException:
             logging.debug("Read modem %s properties failed", modem_path)
             return {}
 
     def _read_ipv4_dbus_properties(self, ip4config_path) -> dict:
         try:
-            proxy = self._bus.get_object("org.freedesktop.NetworkManager", ip4config_path)
-            interface = dbus.Interface(proxy, "org.freedesktop.DBus.Properties")
-            addresses = interface.Get("org.freedesktop.NetworkManager.IP4Config", "Addresses")
-            return {"Addresses": addresses}
+            interface = get_dbus_interface(
+                self._bus, "org.freedesktop.NetworkManager", ip4config_path, "org.freedesktop.DBus.Properties"
+            )
+            address_data = interface.Get("org.freedesktop.NetworkManager.IP4Config", "AddressData")
+            return {"AddressData": address_data}
         except dbus.exceptions.DBusException:
             logging.debug("Error reading Ip4Config properties %s", ip4config_path)
             return {}
 
     def _read_device_dbus_properties(self, device_path) -> dict:
         try:
-            device_proxy = self._bus.get_object("org.freedesktop.NetworkManager", device_path)
-            device_interface = dbus.Interface(device_proxy, "org.freedesktop.DBus.Properties")
+            device_interface = get_dbus_interface(
+                self._bus, "org.freedesktop.NetworkManager", device_path, "org.freedesktop.DBus.Properties"
+            )
             interface = device_interface.Get("org.freedesktop.NetworkManager.Device", "Interface")
             return {"Interface": interface}
         except dbus.exceptions.DBusException:
             logging.debug("Error reading device properties %s", device_path)
             return {}
 
+    # NetworkManager uses ModemManager object path as Udi of modem devices
+    def _read_modem_dbus_path_from_device(self, device_path):
+        if device_path is None:
+            return None
+        try:
+            device_interface = get_dbus_interface(
+                self._bus, "org.freedesktop.NetworkManager", device_path, "org.freedesktop.DBus.Properties"
+            )
+            udi = device_interface.Get("org.freedesktop.NetworkManager.Device", "Udi")
+        except dbus.exceptions.DBusException:
+            logging.debug("Error reading device Udi %s", device_path)
+            return None
+        if udi.startswith("/org/freedesktop/ModemManager1/Modem/"):
+            return udi
+        return None
+
     def _find_modem_dbus_path_by_device(self, device):
         path = None
         if device is not None:
-            proxy = self._bus.get_object("org.freedesktop.ModemManager1", "/org/freedesktop/ModemManager1")
-            interface = dbus.Interface(proxy, "org.freedesktop.DBus.ObjectManager")
+            interface = get_dbus_interface(
+                self._bus,
+                "org.freedesktop.ModemManager1",
+                "/org/freedesktop/ModemManager1",
+                "org.freedesktop.DBus.ObjectManager",
+            )
+            # GetManagedObjects already returns properties of all modems
             modem_manager_objects = interface.GetManagedObjects()
-            modem_paths = modem_manager_objects.keys()
 
-            for modem_path in modem_paths:
-                proxy = self._bus.get_object("org.freedesktop.ModemManager1", modem_path)
-                interface = dbus.Interface(proxy, "org.freedesktop.DBus.Properties")
-                modem_port = interface.Get("org.freedesktop.ModemManager1.Modem", "PrimaryPort")
-                if modem_port == device:
+            for modem_path, modem_interfaces in modem_manager_objects.items():
+                modem_properties = modem_interfaces.get("org.freedesktop.ModemManager1.Modem", {})
+                if modem_properties.get("PrimaryPort") == device:
                     path = modem_path
                     break
         return path
@@ -868,16 +1198,17 @@ class ActiveConnection:  # pylint: disable=R0902
     def update(self, dbus_properties):
         logging.debug("Update active connection %s: %s", self._path, dbus_properties)
 
-        old_state = copy.deepcopy(self.state)
-        self._update_connection_info_from_dbus_properties(dbus_properties)
-        self._update_state_from_dbus_properties(dbus_properties)
+        old_state = replace(self.state)
+        self._update_from_dbus_properties(dbus_properties)
         new_state = self.state
 
         if (  # update modem info for gsm connections when device is changed
             new_state.device != old_state.device and self._type == "gsm"
         ):
             if new_state.device != MqttConnectionState.device:
-                self._modem_path = self._find_modem_dbus_path_by_device(new_state.device)
+                self._modem_path = self._read_modem_dbus_path_from_device(self._device_path)
+                if self._modem_path is None:
+                    self._modem_path = self._find_modem_dbus_path_by_device(new_state.device)
             else:
                 self._modem_path = None
 
@@ -905,67 +1236,80 @@ class ActiveConnection:  # pylint: disable=R0902
     def update_connectivity(self, connectivity: bool):
         self.state.connectivity = connectivity
 
-    # update basic information about connection
-    def _update_connection_info_from_dbus_properties(self, dbus_properties):
-        if "Id" in dbus_properties:
-            self._name = dbus_properties["Id"]
-        if "Uuid" in dbus_properties:
-            self._uuid = dbus_properties["Uuid"]
-        if "Type" in dbus_properties:
-            self._type = dbus_properties["Type"]
-        if "Connection" in dbus_properties:
-            self.connection_path = dbus_properties["Connection"]
+    # update basic information about connection, connection_state, address, device
+    def _update_from_dbus_properties(self, dbus_properties):
+        for name, value in dbus_properties.items():
+            handler = self._DBUS_PROPERTIES_HANDLERS.get(name)
+            if handler is not None:
+                handler(self, value)
 
-    # update connection_state, address, device
-    def _update_state_from_dbus_properties(self, dbus_properties):
-        # pylint: disable=too-many-branches
+    def _set_name(self, name):
+        self._name = name
 
-        if "State" in dbus_properties:
-            self.state.connection_state = ConnectionState(dbus_properties["State"])
+    def _set_uuid(self, uuid):
+        self._uuid = uuid
 
-        if "Ip4Config" in dbus_properties:
-            if dbus_properties["Ip4Config"] == "/":
-                self.state.address = MqttConnectionState.address
-            else:
-                ipv4_properties = self._read_ipv4_dbus_properties(dbus_properties["Ip4Config"])
-                if "Addresses" in ipv4_properties:
-                    self.state.address = self._format_ip4address_list(ipv4_properties["Addresses"])
+    def _set_type(self, connection_type):
+        self._type = connection_type
 
-        if "Devices" in dbus_properties:
-            if len(dbus_properties["Devices"]) == 0:
-                self.state.device = MqttConnectionState.device
-            else:
-                device_properties = self._read_device_dbus_properties(dbus_properties["Devices"][0])
-                if "Interface" in device_properties:
-                    self.state.device = device_properties["Interface"]
-
-        # on ipv4_config_changed_subscription
-        if "Addresses" in dbus_properties:
-            self.state.address = self._format_ip4address_list(dbus_properties["Addresses"])
-
-    def _format_ip4address_list(self, ip4addresses_list):
-        ip4addresses = []
-        for ip4address in ip4addresses_list:
-            ip4addresses.append(
-                ".".join([str(x) for x in struct.unpack("<BBBB", struct.pack("<I", ip4address[0]))])
-            )
-        unical_ip4addresses = list(set(ip4addresses))
+    def _set_connection_path(self, connection_path):
+        self.connection_path = connection_path
 
-        return " ".join(unical_ip4addresses)
+    def _set_connection_state(self, connection_state):
+        self.state.connection_state = ConnectionState(connection_state)
+
+    # Ip4Config and Devices are resent with other properties, objects are read only if they are changed,
+    # paths are stored after successful read, so failed reads are repeated with next signals;
+    # later changes of Ip4Config addresses come from ipv4_config_changed_subscription
+    def _set_ip4config(self, ip4config_path):
+        if ip4config_path == self._ip4config_path:
+            return
+        if ip4config_path == "/":
+            self.state.address = MqttConnectionState.address
+        else:
+            ipv4_properties = self._read_ipv4_dbus_properties(ip4config_path)
+            if "AddressData" not in ipv4_properties:
+                return
+            self.state.address = format_ip4address_data(ipv4_properties["AddressData"])
+        self._ip4config_path = ip4config_path
+
+    def _set_devices(self, devices):
+        if len(devices) == 0:
+            self._device_path = None
+            self.state.device = MqttConnectionState.device
+        elif devices[0] != self._device_path:
+            device_properties = self._read_device_dbus_properties(devices[0])
+            if "Interface" in device_properties:
+                self._device_path = devices[0]
+                self.state.device = device_properties["Interface"]
+
+    # on ipv4_config_changed_subscription
+    def _set_address_data(self, address_data):
+        self.state.address = format_ip4address_data(address_data)
+
+    _DBUS_PROPERTIES_HANDLERS = {
+        "Id": _set_name,
+        "Uuid": _set_uuid,
+        "Type": _set_type,
+        "Connection": _set_connection_path,
+        "State": _set_connection_state,
+        "Ip4Config": _set_ip4config,
+        "Devices": _set_devices,
+        "AddressData": _set_address_data,
+    }
 
     # update signal quality, operator name, access technologies
     def _update_state_from_modem_properties(self, modem_path):
         modem_properties = self._read_modem_dbus_properties(modem_path)
         if "access-technologies" in modem_properties:
-            access_tech = ModemAccessTechnology(modem_properties["access-technologies"])
-            self.state.access_tech = access_tech.name.replace("MM_MODEM_ACCESS_TECHNOLOGY_", "").upper()
+            self.state.access_tech = MODEM_ACCESS_TECHNOLOGY_NAMES[modem_properties["access-technologies"]]
         if "signal-quality" in modem_properties:
             self.state.signal_quality = modem_properties["signal-quality"][0]
         if "m3gpp-operator-name" in modem_properties:
             self.state.operator_name = modem_properties["m3gpp-operator-name"]
 
     # create subscription on active connection and ip v4 config dbus properties
-    def _create_subscription_on_dbus_properties(self) -> DbusSignalSubscription:
+    def _create_subscription_on_dbus_properties(self, properties_iface: str) -> DbusSignalSubscription:
         return DbusSignalSubscription(
             self._mediator,
             self._bus,
@@ -973,6 +1317,7 @@ class ActiveConnection:  # pylint: disable=R0902
                 "PropertiesChanged",
                 "org.freedesktop.DBus.Properties",
                 "org.freedesktop.NetworkManager",
+                properties_iface,
             ),
             EventType.ACTIVE_PROPERTIES_UPDATED,
         )
@@ -987,15 +1332,25 @@ class ActiveConnection:  # pylint: disable=R0902
                 )
 
     # deactivate active connection via dbus
-    def deactivate(self) -> None:
-        try:
-            proxy = self._bus.get_object("org.freedesktop.NetworkManager", "/org/freedesktop/NetworkManager")
-            interface = dbus.Interface(proxy, "org.freedesktop.NetworkManager")
-            # ActivateConnection and DeactivateConnection functions ends very fast
-            # even if connection activating/deactivating process can take a long time
-            interface.DeactivateConnection(self._path)
-        except dbus.exceptions.DBusException:
-            logging.error("The connection %s was not active", self._path)
+    # DeactivateConnection reply is handled by dbus main loop, the call doesn't block events processing
+    def deactivate(self, deactivate_connection) -> None:
+        deactivate_connection(
+            self._path,
+            reply_handler=self._deactivate_reply_handler,
+            error_handler=self._deactivate_error_handler,
+        )
+
+    def _deactivate_reply_handler(self):
+        logging.debug("Deactivation of %s started", self._path)
+        self._mediator.new_dbus_event(
+            Event(EventType.COMMON_SWITCH_FINISHED, connection_path=self.connection_path)
+        )
+
+    def _deactivate_error_handler(self, _):
+        logging.error("The connection %s was not active", self._path)
+        self._mediator.new_dbus_event(
+            Event(EventType.COMMON_SWITCH_FINISHED, connection_path=self.connection_path)
+        )
 
     # clear subscriptions and state before removing object (connnection deactivated)
     def stop(self):
@@ -1068,8 +1423,7 @@ def main():
     logging.basicConfig(level=logging_level)
 
     if options.main_process_pid:
-        pid_fd = os.pidfd_open(int(options.main_process_pid), 0)
-        signal.pidfd_send_signal(pid_fd, signal.SIGHUP)
+        os.kill(int(options.main_process_pid), signal.SIGHUP)
         logging.info("Send SIGHUP signal to %s process", options.main_process_pid)
         return
 
@@ -1080,16 +1434,10 @@ def main():
 
     connections_mediator = ConnectionsMediator(mqtt_client)
 
-    def stop_virtual_connections_client(_, __):
-        connections_mediator.stop()
-        mqtt_client.stop()
-
-    def reload_virtual_connections_client(_, __):
-        connections_mediator.new_event(Event(EventType.RELOAD_CONNECTIVITY))
-
-    signal.signal(signal.SIGINT, stop_virtual_connections_client)
-    signal.signal(signal.SIGTERM, stop_virtual_connections_client)
-    signal.signal(signal.SIGHUP, reload_virtual_connections_client)
+    # signals are handled by GLib main loop, not inside python signal handler
+    GLib.unix_signal_add(GLib.PRIORITY_HIGH, signal.SIGINT, connections_mediator.quit)
+    GLib.unix_signal_add(GLib.PRIORITY_HIGH, signal.SIGTERM, connections_mediator.quit)
+    GLib.unix_signal_add(GLib.PRIORITY_HIGH, signal.SIGHUP, connections_mediator.reload_connectivity)
 
     try:
         connections_mediator.run()
@@ -3,6 +3,10 @@ import logging
 import random
 import threading
 
+# serialized control meta is the same for equal controls of all devices,
+# key is (control_type, read_only, title, order)
+_META_JSON_CACHE = {}
+
 
 class ControlMeta:  # pylint: disable=R0903
     def __init__(
@@ -15,66 +19,86 @@ class ControlMeta:  # pylint: disable=R0903
 
 
 class ControlState:  # pylint: disable=R0903
-    def __init__(self, meta: ControlMeta, value: str) -> None:
+    def __init__(self, meta: ControlMeta, value: str, topic: str) -> None:
         self.meta = ControlMeta(meta.title, meta.control_type, meta.order, meta.read_only)
         self.value = value
+        self.topic = topic
+        self.meta_topic = f"{topic}/meta"
 
 
-class Device:
+class Device:  # pylint: disable=R0902
     def __init__(self, mqtt_client, device_mqtt_name: str, device_title: str, driver_name: str) -> None:
         self._mqtt_client = mqtt_client
+        # publish is called for every control update
+        self._mqtt_publish = mqtt_client.publish
         self._base_topic = f"/devices/{device_mqtt_name}"
+        self._meta_name_topic = f"{self._base_topic}/meta/name"
+        self._meta_driver_topic = f"{self._base_topic}/meta/driver"
         self._device_title = device_title
         self._driver_name = driver_name
         self._controls = {}
-        self._publish(self._base_topic + "/meta/name", device_title)
-        self._publish(self._base_topic + "/meta/driver", driver_name)
+        self._publish(self._meta_name_topic, device_title)
+        self._publish(self._meta_driver_topic, driver_name)
 
     def republish_device(self):
-        self._publish(self._base_topic + "/meta/name", self._device_title)
-        self._publish(self._base_topic + "/meta/driver", self._driver_name)
-        for mqtt_control_name in self._controls.copy():
-            self.republish_control(mqtt_control_name)
+        self._publish(self._meta_name_topic, self._device_title)
+        self._publish(self._meta_driver_topic, self._driver_name)
+        for control in self._controls.values():
+            self._publish_control_meta(control)
+            self._publish(control.topic, control.value)
 
     def remove_device(self) -> None:
-        self._publish(self._base_topic + "/meta/driver", None)
-        self._publish(self._base_topic + "/meta/name", None)
-        for mqtt_control_name in self._controls.copy():
-            self.remove_control(mqtt_control_name)
+        self._publish(self._meta_driver_topic, None)
+        self._publish(self._meta_name_topic, None)
+        for control in self._controls.values():
+            self._publish(control.topic, None)
+            self._publish(control.meta_topic, None)
+        self._controls.clear()
 
     def create_control(self, mqtt_control_name: str, meta: ControlMeta, value: str) -> None:
-        self._controls[mqtt_control_name] = ControlState(meta, None)
-        self._publish_control_meta(mqtt_control_name, meta)
+        control = ControlState(meta, None, self._get_control_base_topic(mqtt_control_name))
+        self._controls[mqtt_control_name] = control
+        self._publish_control_meta(control)
         self.set_control_value(mqtt_control_name, value)
 
     def republish_control(self, mqtt_control_name: str) -> None:
         if mqtt_control_name in self._controls:
             control = self._controls[mqtt_control_name]
             if control:
-                self._publish_control_meta(mqtt_control_name, control.meta)
+                self._publish_control_meta(control)
                 self.set_control_value(mqtt_control_name, control.value, force=True)
 
     def remove_control(self, mqtt_control_name: str) -> None:
         if mqtt_control_name in self._controls:
-            self._controls.pop(mqtt_control_name)
-            self._publish(self._get_control_base_topic(mqtt_control_name), None)
-            self._publish(self._get_control_base_topic(mqtt_control_name) + "/meta", None)
+            control = self._controls.pop(mqtt_control_name)
+            self._publish(control.topic, None)
+            self._publish(control.meta_topic, None)
 
     def set_control_value(self, mqtt_control_name: str, value: str, force=False) -> None:
         if mqtt_control_name in self._controls:
             control = self._controls[mqtt_control_name]
             if control.value != value or force:
                 control.value = value
-                self._publish(self._get_control_base_topic(mqtt_control_name), value)
+                self._publish(control.topic, value)
         else:
             logging.debug("Can't set value of undeclared control %s", mqtt_control_name)
 
+    # set several control values at once, only changed values are published
+    def set_control_values(self, values: dict) -> None:
+        for mqtt_control_name, value in values.items():
+            control = self._controls.get(mqtt_control_name)
+            if control is None:
+                logging.debug("Can't set value of undeclared control %s", mqtt_control_name)
+            elif control.value != value:
+                control.value = value
+                self._publish(control.topic, value)
+
     def set_control_read_only(self, mqtt_control_name: str, read_only: bool) -> None:
         if mqtt_control_name in self._controls:
             control = self._controls[mqtt_control_name]
             if control.meta.read_only != read_only:
                 control.meta.read_only = read_only
-                self._publish_control_meta(mqtt_control_name, control.meta)
+                self._publish_control_meta(control)
         else:
             logging.debug("Can't set readonly property of undeclared control %s", mqtt_control_name)
 
@@ -83,41 +107,44 @@ class Device:
             control = self._controls[mqtt_control_name]
             if control.meta.title != title:
                 control.meta.title = title
-                self._publish_control_meta(mqtt_control_name, control.meta)
+                self._publish_control_meta(control)
         else:
             logging.debug("Can't set title of undeclared control %s", mqtt_control_name)
 
     def add_control_message_callback(self, mqtt_control_name: str, callback: callable) -> None:
         if mqtt_control_name in self._controls:
-            control_base_topic = self._get_control_base_topic(mqtt_control_name)
-            self._mqtt_client.subscribe(control_base_topic + "/on")
-            self._mqtt_client.message_callback_add(control_base_topic + "/on", callback)
+            on_topic = f"{self._controls[mqtt_control_name].topic}/on"
+            self._mqtt_client.subscribe(on_topic)
+            self._mqtt_client.message_callback_add(on_topic, callback)
         else:
             logging.debug("Can't add message callback to undeclared control %s", mqtt_control_name)
 
-    def _get_control_base_topic(self, mqtt_control_name: str) -> None:
+    def _get_control_base_topic(self, mqtt_control_name: str) -> str:
         return f"{self._base_topic}/controls/{mqtt_control_name}"
 
-    def _publish_control_meta(self, mqtt_control_name: str, meta: ControlMeta) -> None:
-        meta_dict = {
-            "type": meta.control_type,
-            "readonly": meta.read_only,
-        }
-        if meta.title is not None:
-            meta_dict["title"] = {"en": meta.title}
-        if meta.order is not None:
-            meta_dict["order"] = meta.order
-
-        if meta_dict:
+    def _publish_control_meta(self, control: ControlState) -> None:
+        meta = control.meta
+        meta_key = (meta.control_type, meta.read_only, meta.title, meta.order)
+        meta_json = _META_JSON_CACHE.get(meta_key)
+        if meta_json is None:
+            meta_dict = {
+                "type": meta.control_type,
+                "readonly": meta.read_only,
+            }
+            if meta.title is not None:
+                meta_dict["title"] = {"en": meta.title}
+            if meta.order is not None:
+                meta_dict["order"] = meta.order
             meta_json = json.dumps(meta_dict)
-            self._publish(self._get_control_base_topic(mqtt_control_name) + "/meta", meta_json)
+            _META_JSON_CACHE[meta_key] = meta_json
+        self._publish(control.meta_topic, meta_json)
 
     def _publish(self, topic: str, value: str) -> None:
         if value is None:
             logging.debug('Clear "%s"', topic)
         else:
             logging.debug('Publish "%s" "%s"', topic, value)
-        self._mqtt_client.publish(topic, value, retain=True)
+        self._mqtt_publish(topic, value, retain=True)
 
 
 def retain_hack(mqtt_client) -> None: